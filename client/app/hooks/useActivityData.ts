@@ -21,6 +21,11 @@ export interface ActivityEvent {
   account_id: string;
 }
 
+export interface EventCursor {
+  after_ts: string;
+  after_id: number;
+}
+
 export interface DailyCount {
   date: string;
   count: number;
@@ -52,60 +57,16 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
   const [events, setEvents] = useState<ActivityEvent[]>([]);
   const [loading, setLoading] = useState(false);
   const [hasMore, setHasMore] = useState(true);
-  const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState<EventCursor | null>(null);
   const [dailyCounts, setDailyCounts] = useState<DailyCount[]>([]);
   const [firstTouchpoints, setFirstTouchpoints] = useState<FirstTouchpoint[]>([]);
   const abortControllerRef = useRef<AbortController | null>(null);
   const loadingRef = useRef(false); // Track loading state to prevent multiple requests
 
-  // Fetch daily counts for minimap
-  const fetchDailyCounts = useCallback(async () => {
-    if (!customerOrgId || !accountId) return;
-    
-    try {
-      console.log('Fetching daily counts from:', `${API_BASE_URL}/api/events/counts/`);
-      const response = await apiClient.get('/api/events/counts/', {
-        params: {
-          customer_org_id: customerOrgId,
-          account_id: accountId,
-          direction: 'IN'
-        }
-      });
-      console.log('Daily counts response:', response.data);
-      setDailyCounts(response.data.daily_counts);
-    } catch (error) {
-      console.error('Error fetching daily counts:', error);
-      if (axios.isAxiosError(error)) {
-        console.error('Axios error details:', {
-          message: error.message,
-          code: error.code,
-          response: error.response?.data,
-          status: error.response?.status
-        });
-      }
-    }
-  }, [customerOrgId, accountId]);
-
-  // Fetch first touchpoints for minimap
-  const fetchFirstTouchpoints = useCallback(async () => {
-    if (!customerOrgId || !accountId) return;
-    
-    try {
-      const response = await apiClient.get('/api/events/first-touchpoints/', {
-        params: {
-          customer_org_id: customerOrgId,
-          account_id: accountId
-        }
-      });
-      console.log('First touchpoints response:', response.data.first_touchpoints);
-      setFirstTouchpoints(response.data.first_touchpoints);
-    } catch (error) {
-      console.error('Error fetching first touchpoints:', error);
-    }
-  }, [customerOrgId, accountId]);
-
-  // Fetch activity events with pagination
-  const fetchEvents = useCallback(async (page: number = 1, append: boolean = false) => {
+  // Fetch activity events with pagination. The first page comes from the
+  // timeline endpoint, which also carries the minimap's daily counts and
+  // first touchpoints; later pages only need the events.
+  const fetchEvents = useCallback(async (cursor: EventCursor | null = null, append: boolean = false) => {
     if (!customerOrgId || !accountId) return;
     
     // Prevent multiple simultaneous requests
@@ -124,13 +85,15 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
     loadingRef.current = true;
 
     try {
-      console.log('Fetching events from:', `${API_BASE_URL}/api/events/`, 'page:', page, 'append:', append);
-      const response = await apiClient.get('/api/events/', {
+      const url = append ? '/api/events/' : '/api/timeline/';
+      console.log('Fetching events from:', `${API_BASE_URL}${url}`, 'cursor:', cursor, 'append:', append);
+      const response = await apiClient.get(url, {
         params: {
           customer_org_id: customerOrgId,
           account_id: accountId,
-          page: page,
-          page_size: 50
+          ...(cursor ?? {}),
+          page_size: 50,
+          ...(append ? {} : { direction: 'IN' })
         },
         signal: abortControllerRef.current.signal
       });
@@ -138,8 +101,7 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
       console.log('Events response:', {
         eventsReceived: response.data.events.length,
         pagination: response.data.pagination,
-        currentPage: response.data.pagination.current_page,
-        totalPages: response.data.pagination.total_pages,
+        nextCursor: response.data.pagination.next_cursor,
         hasNext: response.data.pagination.has_next,
         totalCount: response.data.pagination.total_count
       });
@@ -153,13 +115,15 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
         });
       } else {
         setEvents(response.data.events);
+        setDailyCounts(response.data.daily_counts);
+        setFirstTouchpoints(response.data.first_touchpoints);
         console.log('Set initial events:', response.data.events.length);
       }
       
       const hasNext = response.data.pagination.has_next;
       setHasMore(hasNext);
-      setCurrentPage(page);
-      console.log('Updated state - hasMore:', hasNext, 'currentPage:', page);
+      setNextCursor(response.data.pagination.next_cursor);
+      console.log('Updated state - hasMore:', hasNext, 'nextCursor:', response.data.pagination.next_cursor);
     } catch (error) {
       if (axios.isCancel(error)) {
         console.log('Request was cancelled');
@@ -184,18 +148,18 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
 
   // Load more events (for infinite scroll)
   const loadMore = useCallback(() => {
-    console.log('loadMore called - loadingRef.current:', loadingRef.current, 'hasMore:', hasMore, 'currentPage:', currentPage);
-    if (!loadingRef.current && hasMore) {
-      console.log('Calling fetchEvents for page:', currentPage + 1);
-      fetchEvents(currentPage + 1, true);
+    console.log('loadMore called - loadingRef.current:', loadingRef.current, 'hasMore:', hasMore, 'nextCursor:', nextCursor);
+    if (!loadingRef.current && hasMore && nextCursor) {
+      console.log('Calling fetchEvents after cursor:', nextCursor);
+      fetchEvents(nextCursor, true);
     } else {
       console.log('Not calling fetchEvents:', {
         alreadyLoading: loadingRef.current,
         hasMore: hasMore,
-        nextPage: currentPage + 1
+        nextCursor: nextCursor
       });
     }
-  }, [hasMore, currentPage, fetchEvents]);
+  }, [hasMore, nextCursor, fetchEvents]);
 
   // Fetch events for a specific date range
   const fetchEventsForDateRange = useCallback(async (startDate: string, endDate: string) => {
@@ -282,7 +246,7 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
   useEffect(() => {
     // Reset state when customer/account changes
     setEvents([]);
-    setCurrentPage(1);
+    setNextCursor(null);
     setHasMore(true);
     setDailyCounts([]);
     setFirstTouchpoints([]);
@@ -290,10 +254,8 @@ export function useActivityData({ customerOrgId, accountId }: UseActivityDataPro
     // Only fetch if we have valid customer/account IDs
     if (customerOrgId && accountId) {
       fetchEvents();
-      fetchDailyCounts();
-      fetchFirstTouchpoints();
     }
-  }, [customerOrgId, accountId, fetchEvents, fetchDailyCounts, fetchFirstTouchpoints]);
+  }, [customerOrgId, accountId, fetchEvents]);
 
   // Cleanup on unmount
   useEffect(() => {
@@ -0,0 +1,55 @@
+"""Versioned cache keys for the activity endpoints.
+
+Cached responses embed a version number in their key. Writers bump the version
+instead of deleting entries, so stale results simply stop being looked up and
+age out on their own.
+"""
+
+import time
+
+from django.core.cache import cache
+
+# Version keys must outlive the entries they guard.
+VERSION_TIMEOUT = None
+
+
+def account_version_key(customer_org_id: str, account_id: str) -> str:
+    return f"ae_ver:{customer_org_id}:{account_id}"
+
+
+def customers_version_key() -> str:
+    return "customers_ver"
+
+
+def _initial_version() -> int:
+    # A version key can still be culled when the cache is full. Starting over
+    # from the clock rather than from 1 keeps it from coming back as a version
+    # that surviving entries were stored under.
+    return time.time_ns()
+
+
+def get_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, timeout=VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key: str) -> None:
+    """Invalidate every entry keyed on ``key``'s current version."""
+    # ``incr`` raises on a missing key, so seed it first.
+    cache.add(key, _initial_version(), timeout=VERSION_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:  # pragma: no cover -- evicted between add() and incr()
+        cache.set(key, _initial_version(), timeout=VERSION_TIMEOUT)
+
+
+def bump_account_version(customer_org_id: str, account_id: str) -> None:
+    bump_version(account_version_key(customer_org_id, account_id))
+
+
+def bump_customers_version() -> None:
+    bump_version(customers_version_key())
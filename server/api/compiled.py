@@ -0,0 +1,83 @@
+"""Querysets compiled to SQL once and re-executed with new parameters.
+
+Building and compiling a queryset costs noticeable time on every request. For
+fixed-shape hot queries, ``CompiledQuery`` compiles the queryset once per
+database vendor (and query shape) using sentinel parameter values, remembers
+which SQL parameter came from which argument, and afterwards only prepares the
+new values and runs the cached SQL on a plain cursor.
+"""
+
+from django.db import connection
+
+
+class CompiledQuery:
+    """A queryset whose SQL is compiled once and then executed directly.
+
+    ``build(shape, **values)`` returns the queryset for a given ``shape`` (any
+    hashable describing optional clauses). ``sentinels`` maps each argument
+    name to ``(field, value)``: the model field used to prepare it for the
+    database and a value that must not collide with any other sentinel. When
+    ``limit`` is set, a ``LIMIT`` placeholder is appended to the SQL.
+    """
+
+    def __init__(self, build, sentinels, limit=False):
+        self.build = build
+        self.sentinels = sentinels
+        self.limit = limit
+        self._compiled = {}
+
+    @staticmethod
+    def _prepare(field, value):
+        return field.get_db_prep_value(value, connection, prepared=False)
+
+    def _compile(self, shape, used):
+        qs = self.build(shape, **{name: value for name, (_, value) in self.sentinels.items()})
+        sql, params = qs.query.sql_with_params()
+
+        prepared = {
+            name: self._prepare(field, value)
+            for name, (field, value) in self.sentinels.items()
+        }
+        # Each SQL parameter is either a sentinel, replaced on every execution,
+        # or a constant of the query itself (e.g. JSON keys), kept as is.
+        slots = []
+        for param in params:
+            matches = [name for name, value in prepared.items() if value == param]
+            if len(matches) > 1:
+                raise ValueError(f"Ambiguous sentinel value {param!r}: {matches}")
+            slots.append((matches[0], None) if matches else (None, param))
+
+        # A sentinel that reaches the SQL altered (e.g. through a transform)
+        # would otherwise be frozen into the query as a constant.
+        filled = {name for name, _ in slots if name is not None}
+        if filled != used:
+            raise ValueError(
+                f"Sentinels of shape {shape!r} do not match the arguments: "
+                f"unmatched {sorted(used - filled)}, unexpected {sorted(filled - used)}"
+            )
+
+        if self.limit:
+            sql = f"{sql} LIMIT %s"
+        return sql, slots
+
+    def execute(self, shape, limit=None, **values):
+        """Run the query for ``shape`` with ``values`` and return all rows.
+
+        Arguments passed as ``None`` must not be used by ``shape``; all others
+        must each fill at least one SQL parameter.
+        """
+        key = (connection.vendor, shape)
+        if key not in self._compiled:
+            used = {name for name, value in values.items() if value is not None}
+            self._compiled[key] = self._compile(shape, used)
+        sql, slots = self._compiled[key]
+
+        params = [
+            constant if name is None else self._prepare(self.sentinels[name][0], values[name])
+            for name, constant in slots
+        ]
+        if self.limit:
+            params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
@@ -0,0 +1,70 @@
+"""Database expressions used to build API payloads inside the database."""
+
+from django.db.models import Func, TextField
+
+
+class JSONColumn(Func):
+    """A JSONField column embedded as JSON rather than as a string.
+
+    SQLite stores JSON as text, so it must be parsed with ``json()`` before
+    being nested in ``json_object()``; PostgreSQL's ``jsonb`` needs nothing.
+    """
+
+    template = "%(expressions)s"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template="json(%(expressions)s)", **extra_context)
+
+
+class JSONArrayWithoutKey(Func):
+    """A JSONField array column embedded as JSON, minus ``key`` in its objects.
+
+    Rebuilds the array element by element in a correlated subquery, which
+    keeps the elements' order (``WITH ORDINALITY`` on PostgreSQL, ``json_each``
+    iterates in array order on SQLite). ``key`` is a constant from code and is
+    inlined in the SQL.
+    """
+
+    template = (
+        "(SELECT COALESCE(jsonb_agg("
+        "CASE WHEN jsonb_typeof(e) = 'object' THEN e - '%(key)s' ELSE e END "
+        "ORDER BY o), '[]'::jsonb) "
+        "FROM jsonb_array_elements(%(expressions)s) WITH ORDINALITY AS t(e, o))"
+    )
+
+    def __init__(self, expression, key, **extra):
+        if not key.isidentifier():
+            raise ValueError(f"Unsupported JSON key: {key!r}")
+        super().__init__(expression, key=key, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template=(
+                "(SELECT json_group_array("
+                "CASE WHEN type = 'object' THEN json_remove(value, '$.%(key)s') ELSE value END) "
+                "FROM json_each(%(expressions)s))"
+            ),
+            **extra_context,
+        )
+
+
+class ISODateTime(Func):
+    """A DateTimeField rendered the way ``datetime.isoformat()`` does for UTC.
+
+    PostgreSQL serializes ``timestamptz`` to ISO 8601 inside ``jsonb`` itself.
+    SQLite stores UTC values as ``YYYY-MM-DD HH:MM:SS[.ffffff]`` text, which
+    only needs the ``T`` separator and the offset.
+    """
+
+    template = "%(expressions)s"
+    output_field = TextField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template="(replace(%(expressions)s, ' ', 'T') || '+00:00')",
+            **extra_context,
+        )
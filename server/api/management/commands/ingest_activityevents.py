@@ -7,7 +7,10 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
-from api.models import ActivityEvent
+from api.caching import bump_customers_version
+from api.models import Account, ActivityEvent
+from api.snapshots import embed_person_snapshots
+from api.summaries import refresh_account_summaries
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +64,7 @@ class Command(BaseCommand):
         )
 
         objs = []
+        accounts = set()
         lines_processed = 0
         with jsonl_path.open("r", encoding="utf-8") as handle:
             for line_no, raw_line in enumerate(handle, start=1):
@@ -80,13 +84,32 @@ class Command(BaseCommand):
 
                 if len(objs) >= batch_size:
                     self._bulk_insert(objs)
+                    accounts.update((o.customer_org_id, o.account_id) for o in objs)
                     lines_processed += len(objs)
                     objs.clear()
 
         if objs:
             self._bulk_insert(objs)
+            accounts.update((o.customer_org_id, o.account_id) for o in objs)
             lines_processed += len(objs)
 
+        # bulk_create() bypasses save(), so rebuild the summary tables of every
+        # touched account (which also invalidates their cached aggregates).
+        for customer_org_id, account_id in sorted(accounts):
+            refresh_account_summaries(customer_org_id, account_id)
+        Account.objects.bulk_create(
+            (
+                Account(
+                    customer_org_id=customer_org_id,
+                    account_id=account_id,
+                    display_name=account_id,
+                )
+                for customer_org_id, account_id in accounts
+            ),
+            ignore_conflicts=True,
+        )
+        bump_customers_version()
+
         self.stdout.write(self.style.SUCCESS(f"Successfully imported {lines_processed} ActivityEvent records."))
 
     # ---------------------------------------------------------------------
@@ -96,6 +119,8 @@ class Command(BaseCommand):
     @staticmethod
     def _bulk_insert(objects):
         """Insert objects inside a transaction to ensure atomicity."""
+        # bulk_create() bypasses save(), so embed the person snapshots here.
+        embed_person_snapshots(objects)
         with transaction.atomic():
             ActivityEvent.objects.bulk_create(objects, ignore_conflicts=False)
 
@@ -1,11 +1,13 @@
 import json
 import logging
+from collections import defaultdict
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from api.models import Person
+from api.snapshots import sync_person_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -94,4 +96,12 @@ class Command(BaseCommand):
         with transaction.atomic():
             # We do *not* ignore conflicts here so that the caller is notified
             # about duplicate primary keys or unique constraint violations.
-            Person.objects.bulk_create(objects, ignore_conflicts=False) 
\ No newline at end of file
+            Person.objects.bulk_create(objects, ignore_conflicts=False)
+
+        # bulk_create() skips the post_save signal, so refresh the snapshots
+        # embedded in already-imported events here.
+        person_ids_by_org = defaultdict(set)
+        for person in objects:
+            person_ids_by_org[person.customer_org_id].add(person.id)
+        for customer_org_id, person_ids in person_ids_by_org.items():
+            sync_person_snapshots(customer_org_id, person_ids) 
\ No newline at end of file
@@ -0,0 +1,79 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from api.caching import bump_customers_version
+from api.models import Account, ActivityDailyCount, ActivityEvent, FirstTouchpoint
+from api.summaries import refresh_account_summaries
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Rebuild the ActivityDailyCount and FirstTouchpoint summary tables.
+
+    The tables are maintained on write, so this is only needed after changes
+    that bypass the ORM (raw SQL, restores) or to run as a periodic safety net.
+    By default every account found in ``ActivityEvent`` is rebuilt. ``Account``
+    rows are brought in line as well: created for accounts with events and
+    removed, together with their summaries, for accounts without any.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--customer-org-id",
+            type=str,
+            help="Only rebuild accounts of this customer organisation.",
+        )
+        parser.add_argument(
+            "--account-id",
+            type=str,
+            help="Only rebuild this account.",
+        )
+
+    def handle(self, *args, **options):
+        def account_keys(model):
+            accounts = model.objects.values_list("customer_org_id", "account_id")
+            if options["customer_org_id"]:
+                accounts = accounts.filter(customer_org_id=options["customer_org_id"])
+            if options["account_id"]:
+                accounts = accounts.filter(account_id=options["account_id"])
+            return set(accounts.distinct().order_by())
+
+        accounts = account_keys(ActivityEvent)
+        stale_accounts = (
+            account_keys(Account)
+            | account_keys(ActivityDailyCount)
+            | account_keys(FirstTouchpoint)
+        ) - accounts
+
+        # Rebuilding an account without events clears its summaries.
+        for customer_org_id, account_id in sorted(accounts | stale_accounts):
+            logger.info("Refreshing summaries for %s/%s", customer_org_id, account_id)
+            refresh_account_summaries(customer_org_id, account_id)
+
+        Account.objects.bulk_create(
+            (
+                Account(
+                    customer_org_id=customer_org_id,
+                    account_id=account_id,
+                    display_name=account_id,
+                )
+                for customer_org_id, account_id in accounts
+            ),
+            ignore_conflicts=True,
+        )
+        for customer_org_id, account_id in stale_accounts:
+            Account.objects.filter(
+                customer_org_id=customer_org_id, account_id=account_id
+            ).delete()
+        bump_customers_version()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed summaries for {len(accounts)} account(s), "
+                f"removed {len(stale_accounts)} account(s) without events."
+            )
+        )
@@ -0,0 +1,124 @@
+# Generated by Django 5.2 on 2026-10-15 11:00
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_summaries(apps, schema_editor):
+    """Populate the summary tables from the existing ActivityEvent rows."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    ActivityDailyCount = apps.get_model("api", "ActivityDailyCount")
+    FirstTouchpoint = apps.get_model("api", "FirstTouchpoint")
+
+    daily_counts = Counter()
+    first_touchpoints = {}
+    events = (
+        ActivityEvent.objects.order_by("timestamp", "id")
+        .values(
+            "customer_org_id",
+            "account_id",
+            "direction",
+            "timestamp",
+            "activity",
+            "channel",
+            "people",
+        )
+        .iterator(chunk_size=2000)
+    )
+    for event in events:
+        account = (event["customer_org_id"], event["account_id"])
+        day = timezone.localdate(event["timestamp"])
+        daily_counts[(*account, event["direction"], day)] += 1
+
+        for person_ref in event["people"] or []:
+            person_id = person_ref.get("id") or person_ref.get("person_id")
+            if not person_id or (*account, person_id) in first_touchpoints:
+                continue
+            first_name = person_ref.get("first_name") or ""
+            last_name = person_ref.get("last_name") or ""
+            first_touchpoints[(*account, person_id)] = FirstTouchpoint(
+                customer_org_id=account[0],
+                account_id=account[1],
+                person_id=person_id,
+                person_name=f"{first_name} {last_name}".strip() or "Unknown",
+                email=person_ref.get("email_address") or "",
+                timestamp=event["timestamp"],
+                activity=event["activity"],
+                channel=event["channel"],
+            )
+
+    ActivityDailyCount.objects.bulk_create(
+        ActivityDailyCount(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            direction=direction,
+            date=date,
+            count=count,
+        )
+        for (customer_org_id, account_id, direction, date), count in daily_counts.items()
+    )
+    FirstTouchpoint.objects.bulk_create(first_touchpoints.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_activityevent_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityDailyCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("customer_org_id", models.CharField(max_length=60)),
+                ("account_id", models.CharField(max_length=50)),
+                ("direction", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("count", models.PositiveIntegerField()),
+            ],
+            options={
+                "ordering": ["date"],
+                "unique_together": {
+                    ("customer_org_id", "account_id", "direction", "date")
+                },
+            },
+        ),
+        migrations.CreateModel(
+            name="FirstTouchpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("customer_org_id", models.CharField(max_length=60)),
+                ("account_id", models.CharField(max_length=50)),
+                ("person_id", models.CharField(max_length=64)),
+                ("person_name", models.CharField(max_length=255)),
+                ("email", models.CharField(blank=True, max_length=255)),
+                ("timestamp", models.DateTimeField()),
+                ("activity", models.TextField(null=True)),
+                ("channel", models.CharField(max_length=100)),
+            ],
+            options={
+                "ordering": ["timestamp"],
+                "unique_together": {("customer_org_id", "account_id", "person_id")},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2 on 2026-10-15 11:20
+
+from django.db import migrations
+
+
+SNAPSHOT_KEYS = ("id", "first_name", "last_name", "email_address")
+ORIGINAL_KEY = "_original"
+
+
+def _rewrite_people(ActivityEvent, rewrite_ref):
+    changed = []
+    for event in ActivityEvent.objects.only("id", "people").iterator(chunk_size=2000):
+        people = [rewrite_ref(person_ref) for person_ref in event.people or []]
+        if people != event.people:
+            event.people = people
+            changed.append(event)
+    ActivityEvent.objects.bulk_update(changed, ["people"], batch_size=500)
+
+
+def embed_person_snapshots(apps, schema_editor):
+    """Copy person details into the ``people`` references of existing events."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    FirstTouchpoint = apps.get_model("api", "FirstTouchpoint")
+    Person = apps.get_model("api", "Person")
+
+    persons = Person.objects.order_by().in_bulk()
+
+    def embed(person_ref):
+        person = persons.get(person_ref.get("id") or person_ref.get("person_id"))
+        if person is None:
+            return person_ref
+        return {
+            **person_ref,
+            "id": person.id,
+            "first_name": person.first_name,
+            "last_name": person.last_name,
+            "email_address": person.email_address,
+            ORIGINAL_KEY: {k: person_ref[k] for k in SNAPSHOT_KEYS if k in person_ref},
+        }
+
+    _rewrite_people(ActivityEvent, embed)
+
+    touchpoints = list(FirstTouchpoint.objects.filter(person_id__in=persons))
+    for touchpoint in touchpoints:
+        person = persons[touchpoint.person_id]
+        touchpoint.person_name = f"{person.first_name} {person.last_name}".strip()
+        touchpoint.email = person.email_address
+    FirstTouchpoint.objects.bulk_update(
+        touchpoints, ["person_name", "email"], batch_size=500
+    )
+
+
+def strip_person_snapshots(apps, schema_editor):
+    """Restore the ``people`` references as they were before embedding."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+
+    def strip(person_ref):
+        if ORIGINAL_KEY not in person_ref:
+            return person_ref
+        ref = {
+            k: v for k, v in person_ref.items()
+            if k not in SNAPSHOT_KEYS and k != ORIGINAL_KEY
+        }
+        return {**ref, **person_ref[ORIGINAL_KEY]}
+
+    _rewrite_people(ActivityEvent, strip)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_activity_summaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(embed_person_snapshots, strip_person_snapshots),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-15 11:04
+
+from django.db import migrations, models
+
+
+def backfill_accounts(apps, schema_editor):
+    """Create an Account for every (customer_org_id, account_id) with events."""
+    Account = apps.get_model("api", "Account")
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+
+    pairs = (
+        ActivityEvent.objects.values_list("customer_org_id", "account_id")
+        .distinct()
+        .order_by()
+    )
+    Account.objects.bulk_create(
+        Account(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            display_name=account_id,
+        )
+        for customer_org_id, account_id in pairs
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_embed_person_snapshots"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Account",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("customer_org_id", models.CharField(max_length=60)),
+                ("account_id", models.CharField(max_length=50)),
+                ("display_name", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "ordering": ["customer_org_id", "account_id"],
+                "unique_together": {("customer_org_id", "account_id")},
+            },
+        ),
+        migrations.RunPython(backfill_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-15 11:06
+
+from django.db import migrations, models
+
+
+def backfill_event_positions(apps, schema_editor):
+    """Record which event reference each existing FirstTouchpoint came from."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    FirstTouchpoint = apps.get_model("api", "FirstTouchpoint")
+
+    positions = {}
+    events = (
+        ActivityEvent.objects.order_by("timestamp", "id")
+        .values("id", "customer_org_id", "account_id", "people")
+        .iterator(chunk_size=2000)
+    )
+    for event in events:
+        for person_index, person_ref in enumerate(event["people"] or []):
+            person_id = person_ref.get("id") or person_ref.get("person_id")
+            if person_id:
+                positions.setdefault(
+                    (event["customer_org_id"], event["account_id"], person_id),
+                    (event["id"], person_index),
+                )
+
+    touchpoints = list(FirstTouchpoint.objects.all())
+    for touchpoint in touchpoints:
+        touchpoint.event_id, touchpoint.person_index = positions.get(
+            (touchpoint.customer_org_id, touchpoint.account_id, touchpoint.person_id),
+            (0, 0),
+        )
+    FirstTouchpoint.objects.bulk_update(
+        touchpoints, ["event_id", "person_index"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_account"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="firsttouchpoint",
+            options={"ordering": ["timestamp", "event_id", "person_index"]},
+        ),
+        migrations.AddField(
+            model_name="firsttouchpoint",
+            name="event_id",
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="firsttouchpoint",
+            name="person_index",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_event_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-15 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_firsttouchpoint_event_id_person_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activityevent",
+            index=models.Index(
+                fields=["customer_org_id", "account_id", "id"],
+                name="ae_org_acct_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-15 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_activityevent_ae_org_acct_id_idx"),
+    ]
+
+    operations = [
+        # The model dropped this constraint (``id`` is the primary key) without
+        # a migration; an explicit index on the same columns replaces it.
+        migrations.AlterUniqueTogether(
+            name="person",
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["customer_org_id", "id"], name="person_org_id_idx"
+            ),
+        ),
+    ]
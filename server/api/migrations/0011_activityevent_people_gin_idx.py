@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-15 11:12
+
+from django.db import migrations
+
+INDEX_NAME = "ae_people_gin_idx"
+
+
+def create_people_index(apps, schema_editor):
+    # ``sync_person_snapshots`` narrows events down with ``people @> ...``,
+    # which only PostgreSQL supports, and only a GIN index can serve.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("api", "ActivityEvent")._meta.db_table)
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON {table} "
+        f"USING gin (people jsonb_path_ops)"
+    )
+
+
+def drop_people_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_person_org_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_people_index, drop_people_index),
+    ]
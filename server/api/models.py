@@ -1,9 +1,41 @@
-from django.db import models
+from django.db import models, transaction
+
+from .caching import bump_account_version, bump_customers_version
 
 # Create your models here.
 
+class Account(models.Model):
+    """A customer organisation's account, as listed by the customers endpoint.
+
+    Rows are created as events for a new (customer_org_id, account_id) pair
+    are written, so listing accounts never has to scan ``ActivityEvent``.
+    """
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    display_name = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["customer_org_id", "account_id"]
+        unique_together = (
+            "customer_org_id",
+            "account_id",
+        )
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.customer_org_id} / {self.display_name or self.account_id}"
+
 class ActivityEvent(models.Model):
-    """Represents a single customer-facing activity/touchpoint event."""
+    """Represents a single customer-facing activity/touchpoint event.
+
+    ``save()`` and ``delete()`` keep the derived rows in step: the summary
+    tables (``api.summaries``), ``Account`` and the cached aggregates.
+    Queryset writes (``update()``, ``delete()``, ``bulk_create()``,
+    ``bulk_update()``) bypass them. After changing events that way, run
+    ``refresh_account_summaries()`` for the affected accounts (or the
+    ``refresh_activity_summaries`` command), as ``ingest_activityevents``
+    does.
+    """
 
     # Core identifiers
     customer_org_id = models.CharField(max_length=60)
@@ -48,10 +80,144 @@ class ActivityEvent(models.Model):
             "account_id",
             "touchpoint_id",
         )
+        indexes = [
+            # Every endpoint filters on (customer_org_id, account_id) and then
+            # orders or groups by timestamp.
+            models.Index(
+                fields=["customer_org_id", "account_id", "timestamp"],
+                name="ae_org_acct_ts_idx",
+            ),
+            # Inbound-only variant backing the minimap's activity counts.
+            models.Index(
+                fields=["customer_org_id", "account_id", "timestamp"],
+                condition=models.Q(direction="IN"),
+                name="ae_in_dir_idx",
+            ),
+            # Primary-key seeks within an account, for random sampling.
+            models.Index(
+                fields=["customer_org_id", "account_id", "id"],
+                name="ae_org_acct_id_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .snapshots import embed_person_snapshots
+        from .summaries import record_event, refresh_account_summaries
+
+        adding = self._state.adding
+        # The event and the rows derived from it are written together, so a
+        # failure further down cannot leave the summary tables out of step.
+        with transaction.atomic():
+            # Denormalise person details into ``people`` so reads need no join
+            embed_person_snapshots([self])
+            super().save(*args, **kwargs)
+            account_created = False
+            if adding:
+                _, account_created = Account.objects.get_or_create(
+                    customer_org_id=self.customer_org_id,
+                    account_id=self.account_id,
+                    defaults={"display_name": self.account_id},
+                )
+            # Keep the per-account summary tables in step: a new event can be
+            # folded in incrementally, an edited one may have moved day/direction.
+            if adding:
+                record_event(self)
+            else:
+                refresh_account_summaries(self.customer_org_id, self.account_id)
+        # Invalidate cached aggregates for this account (and the customer list
+        # when the event introduced a new account) once the write is visible.
+        transaction.on_commit(
+            lambda: bump_account_version(self.customer_org_id, self.account_id)
+        )
+        if account_created:
+            transaction.on_commit(bump_customers_version)
+
+    def delete(self, *args, **kwargs):
+        from .summaries import refresh_account_summaries
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_account_summaries(self.customer_org_id, self.account_id)
+            # An account is listed only while it has events
+            account_deleted = False
+            if not ActivityEvent.objects.filter(
+                customer_org_id=self.customer_org_id, account_id=self.account_id
+            ).exists():
+                account_deleted, _ = Account.objects.filter(
+                    customer_org_id=self.customer_org_id, account_id=self.account_id
+                ).delete()
+        transaction.on_commit(
+            lambda: bump_account_version(self.customer_org_id, self.account_id)
+        )
+        if account_deleted:
+            transaction.on_commit(bump_customers_version)
+        return result
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.channel} | {self.activity[:50]}... @ {self.timestamp.isoformat()}"
 
+class ActivityDailyCount(models.Model):
+    """Number of ActivityEvents per account, direction and calendar day.
+
+    Summary table derived from ``ActivityEvent`` so that the minimap counts are
+    a lookup instead of an aggregation over the account's whole history. Kept
+    up to date by ``api.summaries``.
+    """
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    direction = models.CharField(max_length=10)
+    date = models.DateField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = (
+            "customer_org_id",
+            "account_id",
+            "direction",
+            "date",
+        )
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.account_id} {self.direction} {self.date}: {self.count}"
+
+class FirstTouchpoint(models.Model):
+    """Earliest ActivityEvent involving each person of an account.
+
+    Summary table derived from ``ActivityEvent`` (see ``api.summaries``).
+    ``person_name``/``email`` come from the person snapshot embedded in the
+    event and are kept current by ``api.snapshots`` when the person changes.
+    """
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    person_id = models.CharField(max_length=64)
+
+    person_name = models.CharField(max_length=255)
+    email = models.CharField(max_length=255, blank=True)
+
+    # Copied from the first event
+    timestamp = models.DateTimeField()
+    activity = models.TextField(null=True)
+    channel = models.CharField(max_length=100)
+
+    # Position of the first event's reference, breaking timestamp ties the
+    # way the events themselves are ordered (by id, then order in ``people``).
+    event_id = models.BigIntegerField()
+    person_index = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["timestamp", "event_id", "person_index"]
+        unique_together = (
+            "customer_org_id",
+            "account_id",
+            "person_id",
+        )
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.person_id} first seen @ {self.timestamp.isoformat()}"
+
 class Person(models.Model):
     """Represents a single person/contact belonging to a customer organisation.
 
@@ -73,6 +239,10 @@ class Person(models.Model):
     class Meta:
         ordering = ["last_name", "first_name"]
         # No extra uniqueness constraints needed: `id` is the primary key.
+        indexes = [
+            # Persons are always looked up within their organisation.
+            models.Index(fields=["customer_org_id", "id"], name="person_org_id_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.first_name} {self.last_name} <{self.email_address}>"
@@ -0,0 +1,110 @@
+"""Query-parameter parsing shared by the API views.
+
+Parsing helpers raise ``ParamError``; views decorated with
+``handle_param_errors`` turn it into a ``400 Bad Request`` JSON response, so
+each endpoint no longer repeats its own validation boilerplate.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+
+import ciso8601
+from django.http import JsonResponse
+
+# Largest page of events a single request may ask for.
+MAX_PAGE_SIZE = 1000
+
+
+class ParamError(ValueError):
+    """A query parameter is missing or malformed."""
+
+
+def handle_param_errors(view):
+    """Render ``ParamError`` raised by ``view`` as a 400 JSON error."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ParamError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+    return wrapper
+
+
+def require_params(request, *names):
+    """Return the values of required query parameters.
+
+    A single name returns its value; several names return a tuple in the same
+    order.
+    """
+    values = tuple(request.GET.get(name) for name in names)
+    if not all(values):
+        quoted = [f"'{name}'" for name in names]
+        if len(names) == 1:
+            raise ParamError(f"{quoted[0]} query parameter is required.")
+        raise ParamError(f"Both {' and '.join(quoted)} query parameters are required.")
+    return values[0] if len(values) == 1 else values
+
+
+def parse_datetime(value, name):
+    """Parse an optional ISO 8601 query parameter (C parser, accepts ``Z``)."""
+    if not value:
+        return None
+    try:
+        return ciso8601.parse_datetime(value)
+    except ValueError:
+        raise ParamError(f"Invalid {name} format") from None
+
+
+def parse_int(value, name, default=None):
+    """Parse an optional integer query parameter."""
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ParamError(f"Invalid {name} format") from None
+
+
+@dataclass(frozen=True)
+class EventQuery:
+    """Validated query parameters of the ``activity_events`` endpoint."""
+
+    customer_org_id: str
+    account_id: str
+    page_size: int = 50
+    start_dt: datetime | None = None
+    end_dt: datetime | None = None
+    # Keyset cursor: the (timestamp, id) of the last event already returned
+    after_dt: datetime | None = None
+    after_id: int | None = None
+
+    @classmethod
+    def from_request(cls, request):
+        customer_org_id, account_id = require_params(
+            request, "customer_org_id", "account_id"
+        )
+
+        after_dt = after_id = None
+        if request.GET.get("after_ts"):
+            try:
+                after_dt = ciso8601.parse_datetime(request.GET["after_ts"])
+                after_id = int(request.GET.get("after_id"))
+            except (TypeError, ValueError):
+                raise ParamError("Invalid after_ts/after_id cursor") from None
+
+        page_size = parse_int(request.GET.get("page_size"), "page_size", 50)
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ParamError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+        return cls(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            page_size=page_size,
+            start_dt=parse_datetime(request.GET.get("start_date"), "start_date"),
+            end_dt=parse_datetime(request.GET.get("end_date"), "end_date"),
+            after_dt=after_dt,
+            after_id=after_id,
+        )
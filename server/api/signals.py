@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Person
+from .snapshots import SNAPSHOT_FIELDS, sync_person_snapshots
+
+
+@receiver(pre_save, sender=Person)
+def person_saving(sender, instance, update_fields=None, **kwargs):
+    """Note whether the save changes any of the details embedded in events."""
+    if update_fields is not None and not set(update_fields) & set(SNAPSHOT_FIELDS):
+        instance._snapshot_changed = False
+        return
+    stored = (
+        Person.objects.filter(pk=instance.pk).values_list(*SNAPSHOT_FIELDS).first()
+        if not instance._state.adding
+        else None
+    )
+    instance._snapshot_changed = stored != tuple(
+        getattr(instance, field) for field in SNAPSHOT_FIELDS
+    )
+
+
+@receiver(post_save, sender=Person)
+def person_saved(sender, instance, **kwargs):
+    """Propagate a person's new details to the events that embed them."""
+    if instance.__dict__.pop("_snapshot_changed", True):
+        sync_person_snapshots(instance.customer_org_id, [instance.pk])
+
+
+@receiver(post_delete, sender=Person)
+def person_deleted(sender, instance, **kwargs):
+    """Strip a deleted person's details from the events that embed them."""
+    sync_person_snapshots(instance.customer_org_id, [instance.pk])
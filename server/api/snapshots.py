@@ -0,0 +1,152 @@
+"""Person snapshots embedded in ``ActivityEvent.people``.
+
+Every person reference in an event's ``people`` array carries a copy of the
+person's name and email address, so that reading events needs no lookup
+against ``Person``. Snapshots are embedded when events are written and
+rewritten by ``sync_person_snapshots`` whenever persons change.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import ActivityEvent, FirstTouchpoint, Person
+from .summaries import _fallback_name, refresh_account_summaries
+
+SNAPSHOT_FIELDS = ("first_name", "last_name", "email_address")
+
+# Keys a snapshot writes into a reference.
+SNAPSHOT_KEYS = ("id", *SNAPSHOT_FIELDS)
+
+# A snapshotted reference keeps its own values of ``SNAPSHOT_KEYS`` under this
+# key, so stripping the snapshot restores the reference exactly as ingested.
+# ``api.expressions.JSONArrayWithoutKey`` hides it from API payloads.
+ORIGINAL_KEY = "_original"
+
+
+def fetch_persons(person_ids):
+    """Return ``{person_id: details}`` for the existing persons of ``person_ids``."""
+    return {
+        person_id: {
+            "id": person_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email_address": email_address,
+        }
+        for person_id, first_name, last_name, email_address in (
+            Person.objects.filter(id__in=person_ids)
+            .order_by()
+            .values_list("id", *SNAPSHOT_FIELDS)
+        )
+    }
+
+
+def person_ref_id(person_ref):
+    """Return the person id of a ``people`` entry (``id`` or ``person_id``)."""
+    return person_ref.get("id") or person_ref.get("person_id")
+
+
+def snapshot_ref(person_ref, person):
+    """Return ``person_ref`` with ``person``'s details embedded.
+
+    ``person`` is an entry of ``fetch_persons()``. Other keys of the reference
+    are kept. With ``person=None`` (the person was deleted) the snapshot is
+    stripped again, restoring the reference's own values.
+    """
+    original = person_ref.get(ORIGINAL_KEY)
+    if original is None:
+        original = {k: person_ref[k] for k in SNAPSHOT_KEYS if k in person_ref}
+    if person is None:
+        ref = {
+            k: v for k, v in person_ref.items()
+            if k not in SNAPSHOT_KEYS and k != ORIGINAL_KEY
+        }
+        return {**ref, **original}
+    return {**person_ref, **person, ORIGINAL_KEY: original}
+
+
+def embed_person_snapshots(events):
+    """Embed person snapshots into ``events`` in place.
+
+    The persons referenced by all ``events`` are fetched in one query.
+    References to persons that do not exist (yet) are left untouched.
+    """
+    persons = fetch_persons({
+        person_id
+        for event in events
+        for person_ref in (event.people or [])
+        if (person_id := person_ref_id(person_ref))
+    })
+    if not persons:
+        return
+    for event in events:
+        if event.people:
+            event.people = [
+                snapshot_ref(person_ref, persons[person_id])
+                if (person_id := person_ref_id(person_ref)) in persons
+                else person_ref
+                for person_ref in event.people
+            ]
+
+
+def sync_person_snapshots(customer_org_id, person_ids):
+    """Rewrite the embedded snapshots of ``person_ids`` from ``Person``.
+
+    Persons that no longer exist get their snapshots stripped. Their
+    ``FirstTouchpoint`` rows are refreshed as well: renamed persons take the
+    new details, deleted ones fall back to the details of the reference.
+    """
+    person_ids = set(person_ids)
+    if not person_ids:
+        return
+    persons = fetch_persons(person_ids)
+
+    events = ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+    # Narrow down with JSON containment where the backend supports it
+    # (PostgreSQL, served by ``ae_people_gin_idx``); elsewhere the
+    # organisation's events are scanned.
+    if connection.features.supports_json_field_contains:
+        events = events.filter(reduce(or_, (
+            Q(people__contains=[{key: pid}])
+            for pid in person_ids
+            for key in ("id", "person_id")
+        )))
+
+    changed = []
+    for event in events.only("id", "people").order_by().iterator(chunk_size=2000):
+        people = [
+            snapshot_ref(person_ref, persons.get(person_id))
+            if (person_id := person_ref_id(person_ref)) in person_ids
+            else person_ref
+            for person_ref in (event.people or [])
+        ]
+        if people != event.people:
+            event.people = people
+            changed.append(event)
+
+    with transaction.atomic():
+        # bulk_update() skips ActivityEvent.save(): counts and first events
+        # are unaffected by a person's details.
+        ActivityEvent.objects.bulk_update(changed, ["people"], batch_size=500)
+
+        for person_id, person in persons.items():
+            FirstTouchpoint.objects.filter(
+                customer_org_id=customer_org_id, person_id=person_id
+            ).update(
+                person_name=_fallback_name(person["first_name"], person["last_name"]),
+                email=person["email_address"],
+            )
+
+        # A deleted person's first touchpoints are named after the reference
+        # in the first event again, so rebuild the accounts they appear in.
+        deleted_in_accounts = (
+            FirstTouchpoint.objects
+            .filter(customer_org_id=customer_org_id, person_id__in=person_ids - persons.keys())
+            .order_by()
+            .values_list("account_id", flat=True)
+            .distinct()
+        )
+        for account_id in list(deleted_in_accounts):
+            refresh_account_summaries(customer_org_id, account_id)
@@ -0,0 +1,176 @@
+"""Maintenance of the per-account summary tables.
+
+``ActivityDailyCount`` and ``FirstTouchpoint`` are derived from
+``ActivityEvent`` so that the minimap endpoints read a handful of precomputed
+rows instead of scanning an account's whole history. New events are folded in
+incrementally by ``record_event``; anything else (edits, deletes, bulk imports)
+rebuilds the affected account with ``refresh_account_summaries``.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .caching import bump_account_version
+from .models import ActivityDailyCount, ActivityEvent, FirstTouchpoint
+
+
+# First touchpoint per person, computed in the database by unnesting the
+# ``people`` JSON array. PostgreSQL can use ``DISTINCT ON``; SQLite has no
+# equivalent, so it keeps the first row per person with a window function.
+FIRST_TOUCHPOINTS_SQL = {
+    "postgresql": """
+        SELECT DISTINCT ON (person_id)
+            e.id, e.timestamp, e.activity, e.channel,
+            COALESCE(p->>'id', p->>'person_id') AS person_id,
+            r.ord - 1 AS person_index,
+            p->>'first_name' AS ref_first_name,
+            p->>'last_name' AS ref_last_name,
+            p->>'email_address' AS ref_email_address
+        FROM api_activityevent e
+        CROSS JOIN LATERAL jsonb_array_elements(e.people) WITH ORDINALITY AS r(p, ord)
+        WHERE e.customer_org_id = %s
+          AND e.account_id = %s
+          AND COALESCE(p->>'id', p->>'person_id') IS NOT NULL
+        ORDER BY person_id, e.timestamp, e.id, r.ord
+    """,
+    "sqlite": """
+        SELECT id, timestamp, activity, channel, person_id, person_index,
+               ref_first_name, ref_last_name, ref_email_address
+        FROM (
+            SELECT
+                e.id, e.timestamp, e.activity, e.channel,
+                COALESCE(json_extract(p.value, '$.id'), json_extract(p.value, '$.person_id')) AS person_id,
+                p.key AS person_index,
+                json_extract(p.value, '$.first_name') AS ref_first_name,
+                json_extract(p.value, '$.last_name') AS ref_last_name,
+                json_extract(p.value, '$.email_address') AS ref_email_address,
+                ROW_NUMBER() OVER (
+                    PARTITION BY COALESCE(json_extract(p.value, '$.id'), json_extract(p.value, '$.person_id'))
+                    ORDER BY e.timestamp, e.id, p.key
+                ) AS rn
+            FROM api_activityevent e, json_each(e.people) p
+            WHERE e.customer_org_id = %s AND e.account_id = %s
+        )
+        WHERE rn = 1 AND person_id IS NOT NULL
+    """,
+}
+
+
+def _fallback_name(first_name, last_name):
+    """Display name for a person reference without a matching Person."""
+    return f"{first_name or ''} {last_name or ''}".strip() or 'Unknown'
+
+
+def refresh_account_summaries(customer_org_id: str, account_id: str) -> None:
+    """Rebuild both summary tables for one account from its events."""
+    daily_counts = (
+        ActivityEvent.objects
+        .filter(customer_org_id=customer_org_id, account_id=account_id)
+        .annotate(date=TruncDate('timestamp'))
+        .values('direction', 'date')
+        .annotate(count=Count('id'))
+        .order_by()
+        .iterator(chunk_size=2000)
+    )
+    # Let the database pick the earliest event per person; only one row per
+    # distinct person comes back, regardless of how long the history is.
+    # The raw SELECT names only the columns used (the rest stay deferred) and
+    # iterator() streams it without populating the queryset result cache.
+    first_events = ActivityEvent.objects.raw(
+        FIRST_TOUCHPOINTS_SQL[connection.vendor],
+        [customer_org_id, account_id],
+    ).iterator()
+
+    with transaction.atomic():
+        ActivityDailyCount.objects.filter(
+            customer_org_id=customer_org_id, account_id=account_id
+        ).delete()
+        ActivityDailyCount.objects.bulk_create(
+            ActivityDailyCount(
+                customer_org_id=customer_org_id,
+                account_id=account_id,
+                **row,
+            )
+            for row in daily_counts
+        )
+
+        FirstTouchpoint.objects.filter(
+            customer_org_id=customer_org_id, account_id=account_id
+        ).delete()
+        FirstTouchpoint.objects.bulk_create(
+            FirstTouchpoint(
+                customer_org_id=customer_org_id,
+                account_id=account_id,
+                person_id=row.person_id,
+                person_name=_fallback_name(row.ref_first_name, row.ref_last_name),
+                email=row.ref_email_address or '',
+                timestamp=row.timestamp,
+                activity=row.activity,
+                channel=row.channel,
+                event_id=row.id,
+                person_index=row.person_index,
+            )
+            for row in first_events
+        )
+
+    transaction.on_commit(lambda: bump_account_version(customer_org_id, account_id))
+
+
+def _stored_timestamp(event: ActivityEvent):
+    """``event.timestamp`` as the database stores it.
+
+    Like ``DateTimeField``, parse strings and read naive values in the default
+    time zone, so the event lands on the day ``TruncDate`` gives it.
+    """
+    timestamp = ActivityEvent._meta.get_field('timestamp').to_python(event.timestamp)
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, timezone.get_default_timezone())
+    return timestamp
+
+
+def record_event(event: ActivityEvent) -> None:
+    """Fold a newly inserted event into its account's summary tables."""
+    timestamp = _stored_timestamp(event)
+    with transaction.atomic():
+        day = {
+            'customer_org_id': event.customer_org_id,
+            'account_id': event.account_id,
+            'direction': event.direction,
+            'date': timezone.localdate(timestamp),
+        }
+        # get_or_create() recovers from a concurrent insert of the same day,
+        # and the F() update then counts both events.
+        ActivityDailyCount.objects.get_or_create(**day, defaults={'count': 0})
+        ActivityDailyCount.objects.filter(**day).update(count=F('count') + 1)
+
+        for person_index, person_ref in enumerate(event.people or []):
+            person_id = person_ref.get('id') or person_ref.get('person_id')
+            if not person_id:
+                continue
+            touchpoint = {
+                'person_name': _fallback_name(
+                    person_ref.get('first_name'), person_ref.get('last_name')
+                ),
+                'email': person_ref.get('email_address') or '',
+                'timestamp': timestamp,
+                'activity': event.activity,
+                'channel': event.channel,
+                'event_id': event.pk,
+                'person_index': person_index,
+            }
+            # Ties keep the existing row, which has the lower event id.
+            updated = FirstTouchpoint.objects.filter(
+                customer_org_id=event.customer_org_id,
+                account_id=event.account_id,
+                person_id=person_id,
+                timestamp__gt=timestamp,
+            ).update(**touchpoint)
+            if not updated:
+                FirstTouchpoint.objects.get_or_create(
+                    customer_org_id=event.customer_org_id,
+                    account_id=event.account_id,
+                    person_id=person_id,
+                    defaults=touchpoint,
+                )
@@ -1,3 +1,407 @@
-from django.test import TestCase
+import io
+import itertools
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Account, ActivityDailyCount, ActivityEvent, FirstTouchpoint, Person
+from .compiled import CompiledQuery
+from .params import MAX_PAGE_SIZE
+from .snapshots import ORIGINAL_KEY
+from .summaries import refresh_account_summaries
+from .views import EVENTS_PAGE_QUERY, _filtered_events
+
+ORG = "org_test"
+ACCOUNT = "account_test"
+T0 = datetime(2025, 3, 1, 9, 30, tzinfo=dt_timezone.utc)
+
+
+def make_event(touchpoint_id, timestamp, people, account_id=ACCOUNT, direction="IN"):
+    return ActivityEvent.objects.create(
+        customer_org_id=ORG,
+        account_id=account_id,
+        touchpoint_id=touchpoint_id,
+        timestamp=timestamp,
+        activity=f"Activity {touchpoint_id}",
+        channel="email",
+        status="sent",
+        record_type="touchpoint",
+        direction=direction,
+        people=people,
+        involved_team_ids=[],
+        related_opportunity_ids=[],
+    )
+
+
+def summary_rows(account_id=ACCOUNT):
+    """Both summary tables of an account, in a comparable form."""
+    counts = sorted(
+        ActivityDailyCount.objects
+        .filter(customer_org_id=ORG, account_id=account_id)
+        .values_list("direction", "date", "count")
+    )
+    touchpoints = sorted(
+        FirstTouchpoint.objects
+        .filter(customer_org_id=ORG, account_id=account_id)
+        .values_list(
+            "person_id", "person_name", "email", "timestamp", "activity", "channel",
+            "event_id", "person_index",
+        )
+    )
+    return counts, touchpoints
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class APITestCase(TestCase):
+    """Runs against a private in-memory cache, emptied before each test."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class SummaryTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Person.objects.create(
+            customer_org_id=ORG, id="p1", first_name="Ada", last_name="Lovelace",
+            email_address="ada@example.com",
+        )
+        Person.objects.create(
+            customer_org_id=ORG, id="p2", first_name="Alan", last_name="Turing",
+            email_address="alan@example.com",
+        )
+
+    def test_record_event_matches_refresh(self):
+        # Out of order, with equal timestamps, both directions, an unknown
+        # person and references keyed by ``person_id``.
+        make_event("t1", T0 + timedelta(days=2), [{"id": "p1"}])
+        make_event("t2", T0, [{"person_id": "p2"}, {"id": "ghost", "first_name": "Gus"}])
+        make_event("t3", T0, [{"id": "p1"}], direction="OUT")
+        make_event("t4", T0 + timedelta(hours=20), [{"id": "p2"}, {"id": "ghost"}])
+        make_event("t5", T0 - timedelta(days=1), [])
+        incremental = summary_rows()
+
+        refresh_account_summaries(ORG, ACCOUNT)
+
+        self.assertEqual(summary_rows(), incremental)
+        self.assertEqual(len(incremental[1]), 3)
+
+    def test_first_touchpoint_ties_follow_event_order(self):
+        make_event("t1", T0, [{"id": "p2"}, {"id": "ghost"}])
+        make_event("t2", T0, [{"id": "p1"}])
+        expected = ["p2", "ghost", "p1"]
+
+        ordered = FirstTouchpoint.objects.values_list("person_id", flat=True)
+        self.assertEqual(list(ordered), expected)
+        refresh_account_summaries(ORG, ACCOUNT)
+        self.assertEqual(list(ordered), expected)
+
+    def test_naive_timestamp_is_counted_like_aware(self):
+        make_event("t1", T0.replace(tzinfo=None), [{"id": "p1"}])
+        incremental = summary_rows()
+
+        refresh_account_summaries(ORG, ACCOUNT)
+
+        self.assertEqual(summary_rows(), incremental)
+        self.assertEqual(incremental[0], [("IN", T0.date(), 1)])
+
+    def test_failed_summary_update_rolls_back_event(self):
+        with mock.patch("api.summaries.record_event", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                make_event("t1", T0, [{"id": "p1"}])
+
+        self.assertFalse(ActivityEvent.objects.exists())
+        self.assertEqual(summary_rows(), ([], []))
+
+    def test_edit_and_delete_keep_summaries_current(self):
+        event = make_event("t1", T0, [{"id": "p1"}])
+        make_event("t2", T0 + timedelta(days=1), [{"id": "p1"}])
+
+        event.timestamp = T0 + timedelta(days=3)
+        event.save()
+        self.assertEqual(FirstTouchpoint.objects.get().activity, "Activity t2")
+
+        event.delete()
+        self.assertEqual(summary_rows()[0], [("IN", (T0 + timedelta(days=1)).date(), 1)])
+
+
+class AccountTests(APITestCase):
+    def accounts(self):
+        return set(Account.objects.values_list("customer_org_id", "account_id"))
+
+    def test_account_follows_its_events(self):
+        first = make_event("t1", T0, [])
+        second = make_event("t2", T0, [])
+        self.assertEqual(self.accounts(), {(ORG, ACCOUNT)})
+
+        first.delete()
+        self.assertEqual(self.accounts(), {(ORG, ACCOUNT)})
+        second.delete()
+        self.assertEqual(self.accounts(), set())
+
+    def test_refresh_command_repairs_accounts(self):
+        make_event("t1", T0, [{"id": "ghost"}])
+        make_event("t2", T0, [{"id": "ghost"}], account_id="account_gone")
+        # Writes that bypass the ORM
+        Account.objects.filter(account_id=ACCOUNT).delete()
+        ActivityEvent.objects.filter(account_id="account_gone").delete()
+
+        call_command("refresh_activity_summaries", stdout=io.StringIO())
+
+        self.assertEqual(self.accounts(), {(ORG, ACCOUNT)})
+        self.assertEqual(summary_rows("account_gone"), ([], []))
+
+
+class ActivityEventsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        # Several events per timestamp, so pages split inside a tie
+        self.events = [
+            make_event(f"t{i}", T0 + timedelta(hours=i // 3), [])
+            for i in range(10)
+        ]
+
+    def get(self, **params):
+        return self.client.get(
+            reverse("api:activity-events"),
+            {"customer_org_id": ORG, "account_id": ACCOUNT, **params},
+        )
+
+    def test_cursor_walks_every_event_once(self):
+        seen, cursor = [], {}
+        while True:
+            body = self.get(page_size=4, **cursor).json()
+            self.assertEqual(body["pagination"]["total_count"], 10)
+            seen += [event["id"] for event in body["events"]]
+            cursor = body["pagination"]["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [event.id for event in self.events])
+
+    def test_page_size_out_of_range(self):
+        for page_size in (0, -5, MAX_PAGE_SIZE + 1):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.get(page_size=page_size).status_code, 400)
+        # Pages this large are streamed
+        response = self.get(page_size=MAX_PAGE_SIZE)
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))["events"]), 10)
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Person.objects.create(
+            customer_org_id=ORG, id="p1", first_name="Ada", last_name="Lovelace",
+            email_address="ada@example.com",
+        )
+        for i in range(6):
+            make_event(
+                f"t{i}", T0 + timedelta(days=i // 2), [{"id": "p1"}, {"id": f"g{i}"}],
+                direction="IN" if i % 3 else "OUT",
+            )
+
+    def get(self, name, **params):
+        return self.client.get(
+            reverse(name), {"customer_org_id": ORG, "account_id": ACCOUNT, **params}
+        )
+
+    def test_timeline_combines_the_three_endpoints(self):
+        for params in ({}, {"page_size": 2, "direction": "OUT"}, {"start_date": "2025-03-02"}):
+            with self.subTest(**params):
+                timeline = self.get("api:timeline", **params).json()
+                events = self.get("api:activity-events", **params).json()
+                counts = self.get("api:activity-counts", **params).json()
+                touchpoints = self.get("api:first-touchpoints", **params).json()
+
+                self.assertEqual(timeline["events"], events["events"])
+                self.assertEqual(timeline["pagination"], events["pagination"])
+                self.assertEqual(timeline["daily_counts"], counts["daily_counts"])
+                self.assertEqual(timeline["direction"], counts["direction"])
+                self.assertEqual(timeline["first_touchpoints"], touchpoints["first_touchpoints"])
+                self.assertTrue(timeline["events"] and timeline["daily_counts"])
+                self.assertEqual(len(timeline["first_touchpoints"]), 7)
+
+    def test_timeline_requires_org_and_account(self):
+        for params in ({}, {"customer_org_id": ORG}, {"account_id": ACCOUNT}):
+            with self.subTest(**params):
+                response = self.client.get(reverse("api:timeline"), params)
+                self.assertEqual(response.status_code, 400)
+
+
+class CompiledQueryTests(APITestCase):
+    def test_page_query_matches_orm_for_every_shape(self):
+        events = [
+            make_event(f"t{i}", T0 + timedelta(hours=i // 2), [{"id": "p1"}])
+            for i in range(8)
+        ]
+        make_event("o1", T0, [], account_id="account_other")
+        cursor = events[2]
+
+        for shape in itertools.product((False, True), repeat=3):
+            has_start, has_end, has_cursor = shape
+            values = {
+                "customer_org_id": ORG,
+                "account_id": ACCOUNT,
+                "start_dt": T0 + timedelta(hours=1) if has_start else None,
+                "end_dt": T0 + timedelta(hours=3) if has_end else None,
+                "after_dt": cursor.timestamp if has_cursor else None,
+                "after_id": cursor.id if has_cursor else None,
+            }
+            with self.subTest(shape=shape):
+                rows = EVENTS_PAGE_QUERY.execute(shape, limit=5, **values)
+                expected = list(
+                    _filtered_events(shape, **values).values_list("id", flat=True)[:5]
+                )
+                self.assertEqual([row[2] for row in rows], expected)
+                self.assertEqual([json.loads(row[0])["id"] for row in rows], expected)
+
+    def test_altered_sentinel_is_rejected(self):
+        query = CompiledQuery(
+            lambda shape, day: ActivityEvent.objects.filter(timestamp__date=day),
+            sentinels={"day": (ActivityEvent._meta.get_field("timestamp"), T0)},
+        )
+
+        with self.assertRaises(ValueError):
+            query.execute(None, day=T0)
+
+
+class RandomSampleTests(APITestCase):
+    def test_random_persons_are_distinct_and_of_the_org(self):
+        for i in range(8):
+            Person.objects.create(
+                customer_org_id=ORG if i < 7 else "org_other", id=f"p{i}",
+                first_name="P", last_name=str(i), email_address=f"p{i}@example.com",
+            )
+
+        persons = self.client.get(
+            reverse("api:random-people"), {"customer_org_id": ORG}
+        ).json()
+
+        ids = [person["id"] for person in persons]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertTrue(set(ids) <= {f"p{i}" for i in range(7)})
+
+    def test_random_events_are_distinct_and_of_the_account(self):
+        for i in range(15):
+            make_event(f"t{i}", T0, [])
+            make_event(f"o{i}", T0, [], account_id="account_other")
+
+        events = self.client.get(
+            reverse("api:random-activity-events"),
+            {"customer_org_id": ORG, "account_id": ACCOUNT},
+        ).json()
+
+        self.assertEqual(len({event["id"] for event in events}), 10)
+        self.assertEqual({event["account_id"] for event in events}, {ACCOUNT})
+
+    def test_random_events_sample_small_accounts_whole(self):
+        for i in range(3):
+            make_event(f"t{i}", T0 + timedelta(minutes=i), [])
+
+        events = self.client.get(
+            reverse("api:random-activity-events"),
+            {"customer_org_id": ORG, "account_id": ACCOUNT},
+        ).json()
+
+        self.assertEqual(sorted(event["touchpoint_id"] for event in events), ["t0", "t1", "t2"])
+
+
+class SnapshotTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.person = Person.objects.create(
+            customer_org_id=ORG, id="p1", first_name="Ada", last_name="Lovelace",
+            email_address="ada@example.com",
+        )
+
+    def test_snapshot_keeps_reference_keys(self):
+        event = make_event("t1", T0, [{"person_id": "p1", "role_in_touchpoint": "to", "extra": 1}])
+        event.refresh_from_db()
+
+        (ref,) = event.people
+        self.assertEqual(ref["extra"], 1)
+        self.assertEqual(ref["role_in_touchpoint"], "to")
+        self.assertEqual(ref["first_name"], "Ada")
+
+    def test_rename_updates_events_and_touchpoints(self):
+        event = make_event("t1", T0, [{"id": "p1"}])
+        other = make_event("t2", T0, [{"person_id": "p1"}], account_id="account_other")
+
+        self.person.first_name = "Augusta"
+        self.person.save()
+
+        for e in (event, other):
+            e.refresh_from_db()
+            self.assertEqual(e.people[0]["first_name"], "Augusta")
+        self.assertEqual(
+            set(FirstTouchpoint.objects.values_list("person_name", flat=True)),
+            {"Augusta Lovelace"},
+        )
+
+    def test_blank_name_matches_refresh(self):
+        make_event("t1", T0, [{"id": "p1"}])
+
+        self.person.first_name = self.person.last_name = ""
+        self.person.save()
+        synced = summary_rows()
+
+        refresh_account_summaries(ORG, ACCOUNT)
+        self.assertEqual(summary_rows(), synced)
+        self.assertEqual(FirstTouchpoint.objects.get().person_name, "Unknown")
+
+    def test_save_without_snapshot_changes_skips_sync(self):
+        make_event("t1", T0, [{"id": "p1"}])
+
+        with mock.patch("api.signals.sync_person_snapshots") as sync:
+            self.person.job_title = "Analyst"
+            self.person.save()
+            self.person.save(update_fields=["job_title"])
+            sync.assert_not_called()
+
+            self.person.email_address = "ada@lovelace.example"
+            self.person.save()
+            sync.assert_called_once_with(ORG, ["p1"])
+
+    def test_delete_restores_reference(self):
+        ref = {"id": "p1", "first_name": "Own", "last_name": "Name", "extra": 1}
+        event = make_event("t1", T0, [dict(ref)])
+
+        self.person.delete()
+
+        event.refresh_from_db()
+        self.assertEqual(event.people, [ref])
+        touchpoint = FirstTouchpoint.objects.get()
+        self.assertEqual((touchpoint.person_name, touchpoint.email), ("Own Name", ""))
+
+    def test_original_is_not_served(self):
+        make_event("t1", T0, [{"id": "p1", "first_name": "Own"}])
+        make_event("t2", T0, [{"person_id": "p1"}, {"id": "ghost"}])
+        params = {"customer_org_id": ORG, "account_id": ACCOUNT}
+
+        for name in ("api:activity-events", "api:random-activity-events", "api:timeline"):
+            with self.subTest(endpoint=name):
+                body = self.client.get(reverse(name), params).json()
+                events = body if isinstance(body, list) else body["events"]
+                people = [ref for event in events for ref in event["people"]]
+                self.assertEqual(len(people), 3)
+                self.assertFalse(any(ORIGINAL_KEY in ref for ref in people))
+
+    def test_person_created_later_is_embedded(self):
+        event = make_event("t1", T0, [{"id": "p2"}])
+        Person.objects.create(
+            customer_org_id=ORG, id="p2", first_name="Alan", last_name="Turing",
+            email_address="alan@example.com",
+        )
+
+        event.refresh_from_db()
+        self.assertEqual(event.people[0]["email_address"], "alan@example.com")
+        self.assertEqual(FirstTouchpoint.objects.get().person_name, "Alan Turing")
@@ -11,6 +11,7 @@ urlpatterns = [
     path("api/events/", views.activity_events, name="activity-events"),
     path("api/events/counts/", views.activity_counts, name="activity-counts"),
     path("api/events/first-touchpoints/", views.first_touchpoints, name="first-touchpoints"),
+    path("api/timeline/", views.timeline, name="timeline"),
     # Legacy random endpoints
     path("api/events/random/", views.random_activity_events, name="random-activity-events"),
     path("api/people/random/", views.random_persons, name="random-people"),
@@ -1,122 +1,195 @@
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
-from django.db.models import QuerySet, Count
-from django.core.paginator import Paginator
-from django.db.models.functions import TruncDate
-from datetime import datetime
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Q, TextField
+from django.db.models.functions import Cast, JSONObject
+from django.core.cache import cache
+import random
+from datetime import datetime, timezone as dt_timezone
+
+import orjson
 
 # Create your views here.
 
 def index(request):
     return HttpResponse("Hello, world! This is the API root.")
 
-from .models import ActivityEvent, Person
+from .caching import account_version_key, customers_version_key, get_version
+from .compiled import CompiledQuery
+from .expressions import ISODateTime, JSONArrayWithoutKey, JSONColumn
+from .models import Account, ActivityDailyCount, ActivityEvent, FirstTouchpoint, Person
+from .params import EventQuery, handle_param_errors, require_params
+from .snapshots import ORIGINAL_KEY, snapshot_ref
+
+# Seconds a cached aggregate may be served; writes invalidate sooner by bumping
+# the cache version (see ``api.caching``).
+CUSTOMERS_CACHE_TIMEOUT = 5 * 60
+EVENT_COUNT_CACHE_TIMEOUT = 5 * 60
+
+# API representation of an ActivityEvent, rendered to JSON text by the
+# database (``json_object`` / ``jsonb_build_object``).
+EVENT_JSON = Cast(
+    JSONObject(
+        id='id',
+        timestamp=ISODateTime('timestamp'),
+        activity='activity',
+        channel='channel',
+        status='status',
+        people=JSONArrayWithoutKey('people', ORIGINAL_KEY),
+        involved_team_ids=JSONColumn('involved_team_ids'),
+        direction='direction',
+        customer_org_id='customer_org_id',
+        account_id='account_id',
+    ),
+    TextField(),
+)
+
+# Page query of ``activity_events``: compiled once per filter shape, then run
+# directly on a cursor with the request's values (see ``api.compiled``).
+_event_field = ActivityEvent._meta.get_field
+EVENTS_PAGE_QUERY = CompiledQuery(
+    lambda shape, **values: (
+        _filtered_events(shape, **values)
+        .annotate(json=EVENT_JSON, cursor_ts=ISODateTime('timestamp'))
+        .values_list('json', 'cursor_ts', 'id')
+    ),
+    sentinels={
+        'customer_org_id': (_event_field('customer_org_id'), '\x00customer_org_id'),
+        'account_id': (_event_field('account_id'), '\x00account_id'),
+        'start_dt': (_event_field('timestamp'), datetime(1001, 1, 1, tzinfo=dt_timezone.utc)),
+        'end_dt': (_event_field('timestamp'), datetime(1002, 1, 1, tzinfo=dt_timezone.utc)),
+        'after_dt': (_event_field('timestamp'), datetime(1003, 1, 1, tzinfo=dt_timezone.utc)),
+        'after_id': (_event_field('id'), -1003),
+    },
+    limit=True,
+)
+
+# Event pages at least this large are streamed rather than built in memory.
+STREAMING_PAGE_SIZE = 500
+
+# orjson encodes datetimes natively (ISO 8601, like ``isoformat()``).
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
 
 
 # -----------------------------------------------------------------------------
 # API Endpoints
 # -----------------------------------------------------------------------------
 
+@handle_param_errors
 def activity_events(request):
     """Return paginated ActivityEvent records for the given customer and account.
     
     Query parameters:
     - customer_org_id (required)
     - account_id (required)
-    - page (optional, default=1)
+    - after_ts, after_id (optional) - keyset cursor; pass the ``next_cursor``
+      of the previous response to fetch the following page
     - page_size (optional, default=50)
     - start_date (optional, ISO format)
     - end_date (optional, ISO format)
     """
-    customer_org_id = request.GET.get("customer_org_id")
-    account_id = request.GET.get("account_id")
-    page = int(request.GET.get("page", 1))
-    page_size = int(request.GET.get("page_size", 50))
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not customer_org_id or not account_id:
-        return JsonResponse(
-            {
-                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
-            },
-            status=400,
-        )
+    query = EventQuery.from_request(request)
+    rows, pagination = _event_page(query)
+    chunks = _events_json(rows, pagination=pagination)
+
+    if query.page_size >= STREAMING_PAGE_SIZE:
+        return StreamingHttpResponse(chunks, content_type='application/json')
+    return HttpResponse(b''.join(chunks), content_type='application/json')
+
+def _event_page(query):
+    """Fetch one page of events for an ``EventQuery``.
+
+    Returns the page's events as JSON texts and its ``pagination`` payload.
+    """
+    # The COUNT(*) is cached per filter set and invalidated with the account's
+    # other aggregates, so scrolling does not recount the account every page.
+    version = get_version(account_version_key(query.customer_org_id, query.account_id))
+    total_count = cache.get_or_set(
+        f"aec:{query.customer_org_id}:{query.account_id}:"
+        f"{query.start_dt and query.start_dt.isoformat()}:"
+        f"{query.end_dt and query.end_dt.isoformat()}:v{version}",
+        lambda: _filtered_events(
+            (query.start_dt is not None, query.end_dt is not None, False),
+            query.customer_org_id,
+            query.account_id,
+            query.start_dt,
+            query.end_dt,
+        ).count(),
+        EVENT_COUNT_CACHE_TIMEOUT,
+    )
+
+    # Each row comes back as ready-made JSON text (``people`` already embeds
+    # the person details, see ``api.snapshots``), plus the cursor columns.
+    # Fetch one extra row to learn whether another page follows.
+    page_size = query.page_size
+    rows = EVENTS_PAGE_QUERY.execute(
+        (query.start_dt is not None, query.end_dt is not None, query.after_dt is not None),
+        limit=page_size + 1,
+        customer_org_id=query.customer_org_id,
+        account_id=query.account_id,
+        start_dt=query.start_dt,
+        end_dt=query.end_dt,
+        after_dt=query.after_dt,
+        after_id=query.after_id,
+    )
+    has_next = len(rows) > page_size
+    del rows[page_size:]
+    next_cursor = (
+        {'after_ts': rows[-1][1], 'after_id': rows[-1][2]}
+        if has_next else None
+    )
+
+    return [event_json for event_json, _, _ in rows], {
+        'page_size': page_size,
+        'total_count': total_count,
+        'has_next': has_next,
+        'has_previous': query.after_dt is not None,
+        'next_cursor': next_cursor,
+    }
+
+def _filtered_events(shape, customer_org_id, account_id, start_dt=None, end_dt=None,
+                     after_dt=None, after_id=None):
+    """Events of one account in timeline order, with optional filters.
 
-    # Start with base queryset
+    ``shape`` is ``(has_start, has_end, has_cursor)`` and selects which of the
+    date-range and keyset-cursor filters apply.
+    """
+    has_start, has_end, has_cursor = shape
     events_qs = ActivityEvent.objects.filter(
         customer_org_id=customer_org_id, 
         account_id=account_id
-    ).order_by("timestamp")
-    
+    ).order_by("timestamp", "id")
+
     # Apply date filters if provided
-    if start_date:
-        try:
-            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            events_qs = events_qs.filter(timestamp__gte=start_dt)
-        except ValueError:
-            return JsonResponse({"error": "Invalid start_date format"}, status=400)
-    
-    if end_date:
-        try:
-            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            events_qs = events_qs.filter(timestamp__lte=end_dt)
-        except ValueError:
-            return JsonResponse({"error": "Invalid end_date format"}, status=400)
-
-    # Paginate results
-    paginator = Paginator(events_qs, page_size)
-    page_obj = paginator.get_page(page)
-    
-    # Convert to list of dictionaries
-    events = []
-    for event in page_obj:
-        # Enrich people data with Person model details
-        enriched_people = []
-        if event.people:
-            for person_ref in event.people:
-                person_id = person_ref.get('id') or person_ref.get('person_id')
-                if person_id:
-                    try:
-                        person = Person.objects.get(id=person_id)
-                        enriched_people.append({
-                            'id': person.id,
-                            'first_name': person.first_name,
-                            'last_name': person.last_name,
-                            'email_address': person.email_address,
-                            'role_in_touchpoint': person_ref.get('role_in_touchpoint')
-                        })
-                    except Person.DoesNotExist:
-                        # Keep original data if person not found
-                        enriched_people.append(person_ref)
-                else:
-                    enriched_people.append(person_ref)
-        
-        event_dict = {
-            'id': event.id,
-            'timestamp': event.timestamp.isoformat(),
-            'activity': event.activity,
-            'channel': event.channel,
-            'status': event.status,
-            'people': enriched_people,
-            'involved_team_ids': event.involved_team_ids,
-            'direction': event.direction,
-            'customer_org_id': event.customer_org_id,
-            'account_id': event.account_id,
-        }
-        events.append(event_dict)
+    if has_start:
+        events_qs = events_qs.filter(timestamp__gte=start_dt)
+    if has_end:
+        events_qs = events_qs.filter(timestamp__lte=end_dt)
+
+    # Keyset pagination: continue strictly after the (timestamp, id) of the
+    # last event already seen, which stays O(page_size) however deep we page.
+    if has_cursor:
+        events_qs = events_qs.filter(
+            Q(timestamp__gt=after_dt) | Q(timestamp=after_dt, id__gt=after_id)
+        )
+    return events_qs
 
-    return JsonResponse({
-        'events': events,
-        'pagination': {
-            'current_page': page,
-            'total_pages': paginator.num_pages,
-            'total_count': paginator.count,
-            'has_next': page_obj.has_next(),
-            'has_previous': page_obj.has_previous(),
-        }
-    })
+def _events_json(events, **extra):
+    """Yield ``{"events": [...], **extra}`` as byte chunks.
 
+    ``events`` are JSON texts already encoded by the database; ``extra``
+    values are encoded with orjson.
+    """
+    yield b'{"events":['
+    for i, event in enumerate(events):
+        if i:
+            yield b','
+        yield event.encode()
+    yield b']'
+    for key, value in extra.items():
+        yield b',' + orjson.dumps(key) + b':' + orjson.dumps(value, option=ORJSON_OPTIONS)
+    yield b'}'
+
+@handle_param_errors
 def activity_counts(request):
     """Return daily activity counts for minimap visualization.
     
@@ -125,46 +198,42 @@ def activity_counts(request):
     - account_id (required)
     - direction (optional, default="IN")
     """
-    customer_org_id = request.GET.get("customer_org_id")
-    account_id = request.GET.get("account_id")
+    customer_org_id, account_id = require_params(
+        request, "customer_org_id", "account_id"
+    )
     direction = request.GET.get("direction", "IN")
+    # A read of the small ActivityDailyCount table (see ``api.summaries``),
+    # so it is served uncached and always agrees with first_touchpoints.
+    counts = _daily_counts(customer_org_id, account_id, direction)
 
-    if not customer_org_id or not account_id:
-        return JsonResponse(
-            {
-                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
-            },
-            status=400,
-        )
+    return HttpResponse(
+        orjson.dumps({'daily_counts': counts, 'direction': direction}),
+        content_type='application/json',
+    )
 
-    # Get daily counts of activities with specified direction
+def _daily_counts(customer_org_id, account_id, direction):
+    """Read the precomputed per-day event counts for one account and direction."""
     daily_counts = (
-        ActivityEvent.objects
+        ActivityDailyCount.objects
         .filter(
             customer_org_id=customer_org_id,
             account_id=account_id,
             direction=direction
         )
-        .annotate(date=TruncDate('timestamp'))
-        .values('date')
-        .annotate(count=Count('id'))
         .order_by('date')
+        .values_list('date', 'count')
     )
 
     # Convert to list format
-    counts = [
+    return [
         {
-            'date': item['date'].isoformat(),
-            'count': item['count']
+            'date': date.isoformat(),
+            'count': count
         }
-        for item in daily_counts
+        for date, count in daily_counts
     ]
 
-    return JsonResponse({
-        'daily_counts': counts,
-        'direction': direction
-    })
-
+@handle_param_errors
 def first_touchpoints(request):
     """Return first touchpoint per person for minimap markers.
     
@@ -172,58 +241,64 @@ def first_touchpoints(request):
     - customer_org_id (required)
     - account_id (required)
     """
-    customer_org_id = request.GET.get("customer_org_id")
-    account_id = request.GET.get("account_id")
-
-    if not customer_org_id or not account_id:
-        return JsonResponse(
-            {
-                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
-            },
-            status=400,
-        )
+    customer_org_id, account_id = require_params(
+        request, "customer_org_id", "account_id"
+    )
 
-    # Get all events to find first touchpoint per person
-    events = ActivityEvent.objects.filter(
-        customer_org_id=customer_org_id,
-        account_id=account_id
-    ).order_by('timestamp')
+    return HttpResponse(
+        orjson.dumps(
+            {'first_touchpoints': _first_touchpoints(customer_org_id, account_id)},
+            option=ORJSON_OPTIONS,
+        ),
+        content_type='application/json',
+    )
 
-    # Track first touchpoint per person
-    first_touchpoints = {}
-    
-    for event in events:
-        if event.people:  # people is a JSON field
-            for person_ref in event.people:
-                person_id = person_ref.get('id') or person_ref.get('person_id')
-                if person_id and person_id not in first_touchpoints:
-                    try:
-                        person = Person.objects.get(id=person_id)
-                        person_name = f"{person.first_name} {person.last_name}".strip()
-                        person_email = person.email_address
-                    except Person.DoesNotExist:
-                        person_name = f"{person_ref.get('first_name', '')} {person_ref.get('last_name', '')}".strip() or 'Unknown'
-                        person_email = person_ref.get('email_address', '')
-                    
-                    first_touchpoints[person_id] = {
-                        'person_id': person_id,
-                        'person_name': person_name,
-                        'email': person_email,
-                        'timestamp': event.timestamp.isoformat(),
-                        'activity': event.activity,
-                        'channel': event.channel
-                    }
-
-    # Sort first touchpoints by timestamp
-    sorted_touchpoints = sorted(
-        first_touchpoints.values(), 
-        key=lambda x: x['timestamp']
+def _first_touchpoints(customer_org_id, account_id):
+    """Read the precomputed first touchpoint of each person of one account."""
+    # First touchpoints are precomputed per account (see ``api.summaries``),
+    # including the person's name and email taken from the event snapshot.
+    # Rows are already ordered by timestamp (``FirstTouchpoint.Meta.ordering``)
+    return list(
+        FirstTouchpoint.objects
+        .filter(customer_org_id=customer_org_id, account_id=account_id)
+        .values('person_id', 'person_name', 'email', 'timestamp', 'activity', 'channel')
     )
-    
-    return JsonResponse({
-        'first_touchpoints': sorted_touchpoints
-    })
 
+@handle_param_errors
+def timeline(request):
+    """Return everything the timeline view needs to open an account at once.
+
+    Combines the first page of ``activity_events``, the ``activity_counts``
+    and the ``first_touchpoints`` of the account in a single response, so the
+    client makes one round trip instead of three.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (required)
+    - page_size (optional, default=50)
+    - start_date (optional, ISO format)
+    - end_date (optional, ISO format)
+    - direction (optional, default="IN") - direction of the daily counts
+    """
+    query = EventQuery.from_request(request)
+    direction = request.GET.get("direction", "IN")
+
+    # Counts and first touchpoints are reads of the summary tables; only the
+    # event page touches ``ActivityEvent``.
+    rows, pagination = _event_page(query)
+    chunks = _events_json(
+        rows,
+        pagination=pagination,
+        daily_counts=_daily_counts(query.customer_org_id, query.account_id, direction),
+        direction=direction,
+        first_touchpoints=_first_touchpoints(query.customer_org_id, query.account_id),
+    )
+
+    if query.page_size >= STREAMING_PAGE_SIZE:
+        return StreamingHttpResponse(chunks, content_type='application/json')
+    return HttpResponse(b''.join(chunks), content_type='application/json')
+
+@handle_param_errors
 def random_activity_events(request):
     """Return up to 10 random ActivityEvent records for the given customer.
 
@@ -231,36 +306,68 @@ def random_activity_events(request):
     - customer_org_id (required)
     - account_id (required)
     """
-    customer_org_id = request.GET.get("customer_org_id")
-    account_id = request.GET.get("account_id")
-
-    if not customer_org_id or not account_id:
-        return JsonResponse(
-            {
-                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
-            },
-            status=400,
-        )
+    customer_org_id, account_id = require_params(
+        request, "customer_org_id", "account_id"
+    )
 
-    events_qs: QuerySet = (
+    # Use .values() to get dictionaries of all model fields. Sampling seeks
+    # along ``ae_org_acct_id_idx``.
+    events = _random_sample(
         ActivityEvent.objects.filter(
             customer_org_id=customer_org_id, account_id=account_id
-        )
-        .order_by("?")[:10]
+        ).values(),
+        10,
     )
-
-    # Use .values() to get dictionaries of all model fields.
-    events = list(events_qs.values())
+    # Serve the person references as ingested, without embedded snapshots.
+    for event in events:
+        event['people'] = [snapshot_ref(ref, None) for ref in event['people'] or []]
     return JsonResponse(events, safe=False)
 
+def _random_sample(qs, size):
+    """Return up to ``size`` random rows of a ``values()`` queryset, in random order.
+
+    ``order_by("?")`` sorts the whole filtered set by ``RANDOM()``. Instead,
+    pick random points between the smallest and largest primary key of ``qs``
+    and take the first row at or after each one. With an index on the filter
+    columns followed by the primary key, every query is an index seek. Rows
+    that follow a gap in the keys are somewhat more likely to be picked.
+    """
+    pk_name = qs.model._meta.pk.attname
+    qs = qs.order_by("pk")
+    keys = list(qs.values_list("pk", flat=True)[:size + 1])
+    if len(keys) <= size:
+        # Small sets are returned whole
+        rows = list(qs.filter(pk__in=keys))
+        random.shuffle(rows)
+        return rows
+
+    low = keys[0]
+    high = qs.values_list("pk", flat=True).order_by("-pk").first()
+    picked = {}
+    # Extra draws make up for points that land on an already picked row.
+    for _ in range(3 * size):
+        row = qs.filter(pk__gte=random.randint(low, high)).first()
+        picked.setdefault(row[pk_name], row)
+        if len(picked) == size:
+            break
+    return list(picked.values())
+
 def customers(request):
     """Return available customer organizations and their accounts."""
-    
-    # Get distinct customer_org_id and account_id combinations
+    version = get_version(customers_version_key())
+    customers = cache.get_or_set(
+        f"customers:v{version}", _customers, CUSTOMERS_CACHE_TIMEOUT
+    )
+
+    return JsonResponse({
+        'customers': customers
+    })
+
+def _customers():
+    """Group the known accounts by customer."""
     customers_data = (
-        ActivityEvent.objects
-        .values('customer_org_id', 'account_id')
-        .distinct()
+        Account.objects
+        .values('customer_org_id', 'account_id', 'display_name')
         .order_by('customer_org_id', 'account_id')
     )
     
@@ -278,13 +385,12 @@ def customers(request):
         
         customers[org_id]['accounts'].append({
             'account_id': account_id,
-            'display_name': account_id  # Could be enhanced with actual account names
+            'display_name': item['display_name'] or account_id
         })
     
-    return JsonResponse({
-        'customers': list(customers.values())
-    })
+    return list(customers.values())
 
+@handle_param_errors
 def random_persons(request):
     """Return up to 5 random Person records for the given customer.
 
@@ -292,17 +398,12 @@ def random_persons(request):
     - customer_org_id (required)
     """
 
-    customer_org_id = request.GET.get("customer_org_id")
-
-    if not customer_org_id:
-        return JsonResponse(
-            {"error": "'customer_org_id' query parameter is required."},
-            status=400,
-        )
+    customer_org_id = require_params(request, "customer_org_id")
 
-    persons_qs: QuerySet = (
-        Person.objects.filter(customer_org_id=customer_org_id).order_by("?")[:5]
+    # Persons have string keys, which _random_sample() cannot draw from. An
+    # organisation holds few persons, so sorting them (found through
+    # ``person_org_id_idx``) by RANDOM() is cheap.
+    persons = list(
+        Person.objects.filter(customer_org_id=customer_org_id).order_by("?")[:5].values()
     )
-
-    persons = list(persons_qs.values())
     return JsonResponse(persons, safe=False)
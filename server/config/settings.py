@@ -66,6 +66,26 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/stable/topics/cache/
+# Defaults to a per-process in-memory cache, which suits the development
+# server. Cache versions are bumped by every process that writes events
+# (including the ingest commands), and with a per-process cache those bumps
+# are not seen by the server, whose cached aggregates can then lag for up to
+# their timeout. Whenever several processes are involved, point the cache at a
+# shared backend, e.g.:
+#   DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379
+# or django.core.cache.backends.memcached.PyMemcacheCache with "host:port".
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [